@@ -13,4 +13,5 @@ __version__ = importlib.metadata.version('oddish')
 from oddish.apple_health_kit import *
 from oddish.polygon import *
 from oddish.browser import *
-from oddish.map_data import *
\ No newline at end of file
+from oddish.map_data import *
+from oddish.route import *
\ No newline at end of file
@@ -1,7 +1,21 @@
 
 import os
+import functools
 import webbrowser
 
+CHROME_PATH = 'C:/Program Files/Google/Chrome/Application/chrome.exe'
+
+
+@functools.lru_cache(maxsize=None)
+def _get_browser():
+    """
+    Resolve the browser once per process. Chrome if it is installed, otherwise the default browser.
+    """
+    if os.path.exists(CHROME_PATH):
+        return webbrowser.get(f'{CHROME_PATH} %s')
+    return webbrowser.get()
+
+
 def open_browser(out_file):
     """
     Open a file in the browser.
@@ -11,6 +25,5 @@ def open_browser(out_file):
     out_file : str
         The path to save the plot.
     """
-    chrome_path = 'C:/Program Files/Google/Chrome/Application/chrome.exe %s'
     full_path = os.path.abspath(out_file)
-    webbrowser.get(chrome_path).open(full_path)
\ No newline at end of file
+    _get_browser().open(full_path)
@@ -2,15 +2,22 @@
 import os
 import glob
 import time
+import shutil
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+from shapely.ops import unary_union
 from shapely.geometry import Polygon
 
 import oddish
 
 logger = logging.getLogger(__name__)
 
+# Roughly 1 meter in degrees, well below what is visible when the polygons are plotted
+SIMPLIFY_TOLERANCE = 1e-5
+
 
 def load_polygon(path):
     """
@@ -31,11 +38,10 @@ def load_polygon(path):
     """
     ts = time.time()
     logger.debug(f'Loading polygon from {path}.')
-    geo_polygon = pd.read_csv(path, header=None)
-    coordinates = [(x[0], x[1]) for x in geo_polygon.values]
+    coordinates = np.loadtxt(path, delimiter=',', dtype=np.float64, ndmin=2)
 
-    if coordinates[0] != coordinates[-1]:
-        coordinates.append(coordinates[0])
+    if not np.array_equal(coordinates[0], coordinates[-1]):
+        coordinates = np.vstack([coordinates, coordinates[:1]])
 
     polygon = Polygon(coordinates)
     logger.debug(f'Polygon with {len(coordinates)} vertices loaded in {time.time() - ts:.2f} seconds.')
@@ -92,11 +98,19 @@ def show_polygon(polygon, out_file=None, open_browser=True):
         oddish.open_browser(out_file)
 
 
-def show_polygons(polygons, out_file=None, open_browser=True):
+def show_polygons(polygons, out_file=None, open_browser=True, use_cache=False):
     """
     Convert a list of polygons to a GeoPandas DataFrame and plot them.
     https://geopandas.org/en/stable/docs/reference/api/geopandas.GeoDataFrame.explore.html
 
+    Rendering is slow for thousands of polygons, so the polygons are simplified and drawn
+    on a canvas rather than as SVG paths.
+
+    With use_cache the HTML is also kept in a cache folder next to out_file, e.g.
+    ../data/explore/cache/<hash>.html, keyed on a hash of the polygons GeoJSON and the
+    render settings. A later call with the same polygons copies the cached HTML instead
+    of rendering again. Nothing removes old entries, delete the cache folder to clear it.
+
     Parameters
     ----------
     polygons : list
@@ -105,31 +119,51 @@ def show_polygons(polygons, out_file=None, open_browser=True):
         The path to save the plot, by default None
     open_browser : bool, optional
         Open the plot in the browser, by default True
+    use_cache : bool, optional
+        Reuse the HTML of a previous render of the same polygons, by default False
     """
 
-    polygon_df = pd.DataFrame(polygons)
     gdf = gpd.GeoDataFrame(
-        polygon_df, geometry='polygon', crs="EPSG:4326"
+        polygons, geometry='polygon', crs="EPSG:4326"
     )
+    gdf['polygon'] = gdf['polygon'].simplify(SIMPLIFY_TOLERANCE, preserve_topology=True)
 
     if out_file is None:
         out_file = f'../data/explore/polygons.html'
     folders = os.path.dirname(out_file)
     os.makedirs(folders, exist_ok=True)
 
-    def style_function(feature):
-        return {
-            'fill': feature['properties']['fill'],
-            'fillColor': feature['properties']['color'],
-            'fillOpacity': feature['properties']['opacity'],
-        }
-
-    map_html = gdf.explore(
-        tooltip=['name'],
-        style_kwds={
-            "style_function": style_function
-        },
-    ).save(out_file)
+    # Leaflet style option -> polygon property it is read from
+    style_properties = {
+        'fill': 'fill',
+        'fillColor': 'color',
+        'fillOpacity': 'opacity',
+    }
+    explore_kwds = {
+        'tooltip': ['name'],
+        'prefer_canvas': True,
+    }
+
+    render_settings = repr((explore_kwds, style_properties, SIMPLIFY_TOLERANCE))
+    cache_key = hashlib.blake2b(gdf.to_json().encode('utf-8') + render_settings.encode('utf-8'), digest_size=16).hexdigest()
+    cache_file = os.path.join(folders, 'cache', f'{cache_key}.html')
+    if use_cache and os.path.exists(cache_file):
+        logger.debug(f'Using cached polygons plot {cache_file}.')
+        shutil.copyfile(cache_file, out_file)
+    else:
+        def style_function(feature):
+            return {option: feature['properties'][name] for option, name in style_properties.items()}
+
+        map_html = gdf.explore(
+            style_kwds={
+                "style_function": style_function
+            },
+            **explore_kwds,
+        ).save(out_file)
+
+        if use_cache:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            shutil.copyfile(out_file, cache_file)
 
     if open_browser:
         oddish.open_browser(out_file)
@@ -151,9 +185,7 @@ def union_polygons(polygons):
     """
     ts = time.time()
     logger.debug(f'Combining {len(polygons)} polygons.')
-    combined_polygon = Polygon()
-    for polygon in polygons:
-        combined_polygon = combined_polygon.union(polygon)
+    combined_polygon = unary_union(list(polygons))
     logger.debug(f'{len(polygons)} polygons combined in {time.time() - ts:.2f} seconds.')
     return combined_polygon
 
@@ -176,8 +208,7 @@ def build_polygon_hierarchy(folder):
     polygon_df = pd.DataFrame(polygons)
 
     city_region_polygons = []
-    for city in polygon_df['city'].unique():
-        city_df = polygon_df[polygon_df['city'] == city]
+    for city, city_df in polygon_df.groupby('city', sort=False):
         city_polygon = union_polygons(city_df['polygon'])
         city_region_polygons.append({
             'city': city,
@@ -189,17 +220,15 @@ def build_polygon_hierarchy(folder):
     city_region_df = pd.DataFrame(city_region_polygons)
 
     region_polygons = []
-    for city in polygon_df['city'].unique():
-        for region in polygon_df[polygon_df['city'] == city]['region'].unique():
-            region_df = polygon_df[(polygon_df['city'] == city) & (polygon_df['region'] == region)]
-            region_polygon = union_polygons(region_df['polygon'])
-            region_polygons.append({
-                'city': city,
-                'region': region,
-                'section': 'All',
-                'name': f"{city} - {region}",
-                'polygon': region_polygon,
-            })
+    for (city, region), region_df in polygon_df.groupby(['city', 'region'], sort=False):
+        region_polygon = union_polygons(region_df['polygon'])
+        region_polygons.append({
+            'city': city,
+            'region': region,
+            'section': 'All',
+            'name': f"{city} - {region}",
+            'polygon': region_polygon,
+        })
     region_df = pd.DataFrame(region_polygons)
 
     combined_df = pd.concat([polygon_df, city_region_df, region_df], ignore_index=True)
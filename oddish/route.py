@@ -0,0 +1,85 @@
+
+import time
+import logging
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def _haversine_numpy(lat, lon):
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    distances = np.zeros(lat.shape[0])
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+    distances[1:] = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+    return distances
+
+
+if _HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_numba(lat, lon):
+        distances = np.zeros(lat.shape[0])
+        for i in prange(1, lat.shape[0]):
+            lat0, lat1 = np.radians(lat[i - 1]), np.radians(lat[i])
+            dlat = lat1 - lat0
+            dlon = np.radians(lon[i]) - np.radians(lon[i - 1])
+            a = np.sin(dlat / 2) ** 2 + np.cos(lat0) * np.cos(lat1) * np.sin(dlon / 2) ** 2
+            distances[i] = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+        return distances
+
+
+def haversine(lat, lon):
+    """
+    Great circle distance between consecutive points.
+    Runs as a parallel numba kernel when numba is installed, otherwise as vectorized numpy.
+
+    Parameters
+    ----------
+    lat : array-like
+        The latitudes of the points in degrees.
+    lon : array-like
+        The longitudes of the points in degrees.
+
+    Returns
+    -------
+    numpy.ndarray
+        The distance in meters from the previous point. The first point is 0.
+    """
+    lat = np.ascontiguousarray(lat, dtype=np.float64)
+    lon = np.ascontiguousarray(lon, dtype=np.float64)
+    if _HAS_NUMBA:
+        return _haversine_numba(lat, lon)
+    return _haversine_numpy(lat, lon)
+
+
+def route_distances(routes):
+    """
+    Distance covered since the previous track point of the same route.
+
+    Parameters
+    ----------
+    routes : pandas.DataFrame
+        The routes table of an AppleHealthKit object (route_id, lat, lon, ...).
+
+    Returns
+    -------
+    pandas.Series
+        The distance in meters from the previous track point. The first track point of each route is 0.
+    """
+    ts = time.time()
+    distances = haversine(routes['lat'].to_numpy(), routes['lon'].to_numpy())
+
+    route_codes, _ = pd.factorize(routes['route_id'])
+    distances[1:][route_codes[1:] != route_codes[:-1]] = 0
+
+    logger.debug(f'Route distances for {len(distances):,} track points computed in {time.time() - ts:.2f} seconds.')
+    return pd.Series(distances, index=routes.index, name='distance')